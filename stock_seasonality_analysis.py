@@ -2,14 +2,28 @@ import tkinter as tk
 from tkinter import messagebox
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from calendar import month_abbr
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import islice, repeat
 import os
+import threading
 
 # ---------------- CONFIG ----------------
 LOOKBACK_YEARS = 15
+DOWNLOAD_BATCH_SIZE = 20  # tickers per yf.download request
+PRICE_FIELDS = ["Open", "Close"]  # the only columns the analysis reads
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "seasonality")
+RESULT_CACHE_SIZE = 16  # analysis results kept in memory for repeat runs
 MONTH_NAMES = list(month_abbr)[1:]  # Jan–Dec
 
+ORDERED_COLUMNS = tuple(  # Jan Avg. Rtn, Jan Hit Rate, Feb Avg. Rtn, ...
+    col for month in MONTH_NAMES
+    for col in (f"{month} Avg. Rtn (%)", f"{month} Hit Rate (%)")
+)
+
 POPULAR_TICKERS = {
     "US Stocks": [
         "AAPL (Apple)", "MSFT (Microsoft)", "TSLA (Tesla)",
@@ -23,51 +37,236 @@ POPULAR_TICKERS = {
 }
 
 # ------------- ANALYSIS LOGIC -------------
-def analyze_all_months_performance(tickers, years):
-    end_date = pd.to_datetime("today").normalize()
-    start_date = end_date - pd.DateOffset(years=years)
+result_cache = OrderedDict()  # (tickers, years, date) -> seasonality DataFrame
+
+
+def download_history(tickers, start_date, end_date):
+    # One request per batch of tickers instead of one per ticker.
+    # Columns are a (ticker, field) MultiIndex.
+    frames = []
+    remaining = iter(dict.fromkeys(tickers))
+
+    while batch := list(islice(remaining, DOWNLOAD_BATCH_SIZE)):
+        data = yf.download(
+            batch,
+            start=start_date,
+            end=end_date,
+            group_by="ticker",
+            threads=True,
+            actions=False,
+            progress=False
+        )
 
-    all_results = []
+        # Older yfinance versions return flat columns for a single ticker
+        if not isinstance(data.columns, pd.MultiIndex):
+            data = pd.concat({batch[0]: data}, axis=1)
+
+        # Drop High/Low/Volume etc. and halve the width of what's left
+        fields = data.columns.get_level_values(1).isin(PRICE_FIELDS)
+        frames.append(data.loc[:, fields].astype(np.float32))
+
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, axis=1, sort=True)
 
-    for ticker in tickers:
-        data = yf.download(ticker, start=start_date, end=end_date, progress=False)
 
-        if data.empty:
+def cache_path(ticker):
+    # Hex-encode the symbol: tickers like ^GSPC or CON (a reserved device
+    # name on Windows) are not safe file names as-is
+    return os.path.join(CACHE_DIR, f"{ticker.encode().hex()}.pkl")
+
+
+def read_cache(ticker, start_date):
+    # Anything unreadable (missing file, other pandas version, wrong layout)
+    # is just a cache miss; the ticker gets downloaded again.
+    try:
+        entry = pd.read_pickle(cache_path(ticker))
+        frame = entry["data"][PRICE_FIELDS].astype(np.float32)
+
+        if entry["start"] <= start_date and not frame.empty:
+            return entry["fetched"], frame
+    except Exception:
+        pass
+
+    return None
+
+
+def write_cache(ticker, frame, start_date, fetched):
+    # The cache is only a speed-up; if it can't be written, carry on without it
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pd.to_pickle(
+            {"start": start_date, "fetched": fetched, "data": frame},
+            cache_path(ticker)
+        )
+    except OSError:
+        pass
+
+
+def load_history(tickers, start_date, end_date):
+    # Daily bars are cached per ticker. Yahoo re-adjusts past prices after
+    # splits and dividends, so a month is only ever taken from one download:
+    # warm runs re-fetch each ticker from the start of its last cached month,
+    # and at most once per day. Also returns the cached tickers whose refresh
+    # failed, since their bars may be out of date.
+    tickers = list(dict.fromkeys(tickers))
+    cached = {}
+    refresh = {}  # month start -> cached tickers to re-fetch from there
+
+    for ticker in tickers:
+        entry = read_cache(ticker, start_date)
+        if entry is None:
             continue
 
-        ticker_results = {"Ticker": ticker}
+        fetched, frame = entry
+        cached[ticker] = frame
+
+        if fetched < end_date:
+            since = frame.index.max().replace(day=1)
+            refresh.setdefault(since, []).append(ticker)
+
+    updated = {}
+    stale = set()
+
+    missing = [t for t in tickers if t not in cached]
+    if missing:
+        fresh = download_history(missing, start_date, end_date)
+        for ticker in missing:
+            if ticker in fresh:
+                updated[ticker] = fresh[ticker].dropna(how="all")
+
+    for since, group in refresh.items():
+        delta = download_history(group, since, end_date)
+        for ticker in group:
+            rows = delta[ticker].dropna(how="all") if ticker in delta else None
+
+            # Nothing came back (network error, delisted): keep the old bars
+            # and try again on the next run
+            if rows is None or rows.empty:
+                stale.add(ticker)
+                continue
+
+            frame = cached[ticker]
+            updated[ticker] = pd.concat([frame[frame.index < since], rows])
+
+    for ticker, frame in updated.items():
+        if not frame.empty:
+            write_cache(ticker, frame, start_date, end_date)
+
+    frames = {**cached, **updated}
+    history = {
+        t: frames[t].loc[start_date:end_date - pd.Timedelta(days=1)]
+        for t in tickers if t in frames
+    }
+
+    if not history:
+        return pd.DataFrame(), stale
+
+    return pd.concat(history, axis=1, sort=True), stale
+
 
-        for month_num, month_name in enumerate(MONTH_NAMES, start=1):
-            monthly_returns = []
+def analyze_ticker(data, month_ids, month_index, out):
+    # month_ids: sorted months-since-1970 of every month in the history
+    # month_index: position in month_ids of each row of data
+    # out: this ticker's row of the result array, filled in ORDERED_COLUMNS order
+    # Rows from other tickers' calendars come through as all-NaN
+    present = data.notna().any(axis=1).to_numpy()
 
-            for year in range(start_date.year, end_date.year + 1):
-                month_data = data[
-                    (data.index.month == month_num) &
-                    (data.index.year == year)
-                ]
+    if not present.any():
+        return False
 
-                if month_data.empty or len(month_data) < 5:
-                    continue
+    open_arr = data["Open"].to_numpy()[present]
+    close_arr = data["Close"].to_numpy()[present]
 
-                start_price = float(month_data["Open"].iloc[0])
-                end_price = float(month_data["Close"].iloc[-1])
+    # The index is sorted, so every calendar month is one contiguous run
+    trading_days = np.bincount(month_index[present], minlength=month_ids.size)
+    ends = np.cumsum(trading_days)
+    starts = ends - trading_days
+    valid = trading_days >= 5
 
-                monthly_returns.append((end_price - start_price) / start_price)
+    starts, ends = starts[valid], ends[valid] - 1
+    month_returns = (close_arr[ends] - open_arr[starts]) / open_arr[starts]
 
-            if monthly_returns:
-                series = pd.Series(monthly_returns)
-                avg_return = float(series.mean()) * 100
-                hit_rate = (series.gt(0).sum() / len(series)) * 100
-            else:
-                avg_return = 0.0
-                hit_rate = 0.0
+    # One row per calendar year, Jan–Dec; months without a return stay NaN
+    first_id = month_ids[0] - month_ids[0] % 12
+    returns = np.full((month_ids[-1] // 12 - first_id // 12 + 1, 12), np.nan)
+    returns.flat[month_ids[valid] - first_id] = month_returns
 
-            ticker_results[f"{month_name} Avg. Rtn (%)"] = avg_return
-            ticker_results[f"{month_name} Hit Rate (%)"] = hit_rate
+    observed = (~np.isnan(returns)).sum(axis=0)
+    has_data = observed > 0
 
-        all_results.append(ticker_results)
+    out[0::2] = np.divide(
+        np.nansum(returns, axis=0), observed, out=np.zeros(12), where=has_data
+    ) * 100
+    out[1::2] = np.divide(
+        (returns > 0).sum(axis=0), observed, out=np.zeros(12), where=has_data
+    ) * 100
 
-    return pd.DataFrame(all_results)
+    return True
+
+
+def analyze_all_months_performance(tickers, years):
+    # Re-running the same tickers on the same day gives the same answer.
+    # The report is sorted by ticker anyway, so input order doesn't matter.
+    key = (tuple(sorted(set(tickers))), years, date.today())
+
+    if key in result_cache:
+        # Least recently used results sit at the front and are evicted first
+        result_cache.move_to_end(key)
+    else:
+        df, stale = compute_seasonality(key[0], years, key[2])
+
+        # Don't pin a transient download failure for the rest of the day
+        if stale or len(df) < len(key[0]):
+            return df
+
+        if len(result_cache) >= RESULT_CACHE_SIZE:
+            result_cache.popitem(last=False)
+        result_cache[key] = df
+
+    return result_cache[key].copy()
+
+
+def compute_seasonality(tickers, years, as_of):
+    # Returns the seasonality table and the tickers whose cached bars could
+    # not be refreshed
+    end_date = pd.Timestamp(as_of)
+    start_date = end_date - pd.DateOffset(years=years)
+
+    history, stale = load_history(tickers, start_date, end_date)
+    tickers = [t for t in tickers if t in history]
+
+    if not tickers:
+        return pd.DataFrame(columns=pd.Index(ORDERED_COLUMNS)), stale
+
+    # All tickers share the combined calendar, so group its rows by month once.
+    # Months since 1970-01 straight from the int64 timestamps (id % 12 == month - 1)
+    month_ids, month_index = np.unique(
+        history.index.values.astype("datetime64[M]").astype(np.int64),
+        return_inverse=True
+    )
+
+    # One row per ticker; each worker writes only its own row
+    results = np.empty((len(tickers), len(ORDERED_COLUMNS)), dtype=np.float64)
+
+    # Per-ticker work is independent and mostly inside NumPy's C code
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        found = np.fromiter(executor.map(
+            analyze_ticker,
+            (history[t] for t in tickers),
+            repeat(month_ids),
+            repeat(month_index),
+            results
+        ), dtype=bool, count=len(tickers))
+
+    df = pd.DataFrame(
+        results[found],
+        index=pd.Index(tickers, name="Ticker")[found],
+        columns=pd.Index(ORDERED_COLUMNS)
+    )
+
+    return df, stale
 
 # ---------------- GUI LOGIC ----------------
 def run_analysis():
@@ -80,28 +279,25 @@ def run_analysis():
     tickers = [t.strip().upper() for t in raw_input.split(",") if t.strip()]
 
     status_label.config(text="Running analysis... Please wait ⏳", fg="orange")
-    root.update()
+    run_button.config(state="disabled")
+
+    # Download + analysis run off the Tk thread so the window stays responsive
+    threading.Thread(target=analysis_worker, args=(tickers,), daemon=True).start()
 
+
+def analysis_worker(tickers):
+    # Runs on a background thread: no Tk calls here, results go back via root.after
     try:
         df = analyze_all_months_performance(tickers, LOOKBACK_YEARS)
 
         if df.empty:
-            messagebox.showwarning("No Data", "No valid data found for given tickers.")
-            status_label.config(text="Ready", fg="green")
+            root.after(0, finish_analysis, None, None)
             return
 
         # -------- FORMAT DATAFRAME --------
-        df.set_index("Ticker", inplace=True)
         df = df.round(2)
         df.sort_index(inplace=True)
 
-        ordered_columns = []
-        for month in MONTH_NAMES:
-            ordered_columns.append(f"{month} Avg. Rtn (%)")
-            ordered_columns.append(f"{month} Hit Rate (%)")
-
-        df = df[ordered_columns]
-
         # -------- SAVE EXCEL --------
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"stock_seasonality_results_{timestamp}.xlsx"
@@ -110,24 +306,41 @@ def run_analysis():
         save_path = os.path.join(documents_path, filename)
 
 
-        with pd.ExcelWriter(save_path, engine="openpyxl") as writer:
+        with pd.ExcelWriter(save_path, engine="xlsxwriter") as writer:
             df.to_excel(writer, sheet_name="Seasonality", index=True)
-            worksheet = writer.sheets["Seasonality"]
+            writer.sheets["Seasonality"].autofit()
+
+    except Exception as e:
+        root.after(0, finish_analysis, None, e)
+        return
 
-            for column_cells in worksheet.columns:
-                max_len = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
-                worksheet.column_dimensions[column_cells[0].column_letter].width = max_len + 2
+    root.after(0, finish_analysis, save_path, None)
 
+
+def open_report(save_path):
+    # Runs on a background thread; failures are reported back on the Tk thread
+    try:
         os.startfile(save_path)
+    except Exception as e:
+        root.after(0, messagebox.showerror, "Error", f"Could not open {save_path}:\n{e}")
+
+
+def finish_analysis(save_path, error):
+    # Back on the Tk thread
+    if error is not None:
+        messagebox.showerror("Error", str(error))
+    elif save_path is None:
+        messagebox.showwarning("No Data", "No valid data found for given tickers.")
+    else:
+        # Excel can take seconds to cold-start; don't hold the Tk thread for it
+        threading.Thread(target=open_report, args=(save_path,), daemon=True).start()
 
         messagebox.showinfo(
             "Completed",
-            f"Analysis completed successfully!\n\nExcel file saved & opened:\n{filename}"
+            f"Analysis completed successfully!\n\nExcel file saved & opened:\n{os.path.basename(save_path)}"
         )
 
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
-
+    run_button.config(state="normal")
     status_label.config(text="Ready", fg="green")
 
 # ---------------- GUI SETUP ----------------
@@ -182,13 +395,14 @@ tk.Label(
 ).pack(anchor="w", fill="x")
 
 
-tk.Button(
+run_button = tk.Button(
     root,
     text="Run Analysis",
     font=("Arial", 12),
     width=22,
     command=run_analysis
-).pack(pady=12)
+)
+run_button.pack(pady=12)
 
 status_label = tk.Label(root, text="Ready", font=("Arial", 10), fg="green")
 status_label.pack(pady=8)